@@ -0,0 +1,22 @@
+"""
+Build the flight_kernels extension module from the Numba kernels in
+kernels.py, so plot_flight.py does not pay JIT compile cost on each run.
+
+Usage: python compile_kernels.py
+"""
+import os
+
+from numba.pycc import CC
+
+import kernels
+
+cc = CC('flight_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Exported signatures must match the argument types plot_flight.py passes
+cc.export('ground_level', 'f4(f4[:], i8, f4)')(kernels.ground_level.py_func)
+cc.export('derivatives', 'UniTuple(f4[:], 2)(f4[:], i8, f4)')(kernels.derivatives.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Compiled kernels to: {cc.output_dir}")
@@ -0,0 +1,87 @@
+"""
+Numba kernels used by plot_flight.py.
+
+These are JIT compiled (and cached on disk) on first use. Running
+compile_kernels.py builds them ahead of time into the flight_kernels
+extension module, which plot_flight.py prefers when it is available.
+"""
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def ground_level(alt, window, std_thresh):
+    """
+    Single pass over the altitude readings: keep a running sum and sum of
+    squares over the window and record the 0.5m bucket of every reading
+    whose window is stable, then take the most common bucket with
+    np.bincount. Like pandas' rolling std, a window holding any non-finite
+    reading is never stable. Returns NaN if no window is stable.
+    """
+    n = alt.size
+    buckets = np.empty(n, dtype=np.int64)
+    count = 0
+    var_thresh = std_thresh * std_thresh
+    
+    # Offset by the first finite reading to keep the sum of squares well
+    # conditioned, and accumulate in float64 so the running sums do not drift
+    ref = np.nan
+    for i in range(n):
+        if np.isfinite(alt[i]):
+            ref = alt[i]
+            break
+    if np.isnan(ref):
+        return np.nan
+    
+    # Non-finite readings are left out of the sums and counted instead, so
+    # the window recovers once they slide out of it
+    total = 0.0
+    total_sq = 0.0
+    missing = 0
+    for i in range(n):
+        if np.isfinite(alt[i]):
+            d = alt[i] - ref
+            total += d
+            total_sq += d * d
+        else:
+            missing += 1
+        if i >= window:
+            if np.isfinite(alt[i - window]):
+                d_old = alt[i - window] - ref
+                total -= d_old
+                total_sq -= d_old * d_old
+            else:
+                missing -= 1
+        if i >= window - 1 and missing == 0:
+            # Sample variance (ddof=1), matching pandas' rolling std
+            var = (total_sq - total * total / window) / (window - 1)
+            # Bucket values feed np.bincount, which rejects negative input
+            if var < var_thresh and np.isfinite(alt[i]):
+                buckets[count] = int(np.rint(alt[i] * 2))
+                count += 1
+    
+    if count == 0:
+        return np.nan
+    
+    # Bins only span the stable readings, not the whole flight
+    stable = buckets[:count]
+    offset = stable.min()
+    counts = np.bincount(stable - offset)
+    return (counts.argmax() + offset) / 2.0
+
+@njit(cache=True)
+def derivatives(alt, lag, dt):
+    """
+    Velocity and acceleration as lagged differences over lag samples,
+    computed together in a single pass. The first lag velocity and
+    2 * lag acceleration values are NaN.
+    """
+    n = alt.size
+    vel = np.empty_like(alt)
+    accel = np.empty_like(alt)
+    vel[:lag] = np.nan
+    accel[:2 * lag] = np.nan
+    for i in range(lag, n):
+        vel[i] = (alt[i] - alt[i - lag]) / dt
+        if i >= 2 * lag:
+            accel[i] = (vel[i] - vel[i - lag]) / dt
+    return vel, accel
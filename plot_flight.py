@@ -1,109 +1,152 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import sys
 
+def load_kernels():
+    """
+    Import the analysis kernels, preferring the ahead-of-time compiled ones
+    built by compile_kernels.py over the Numba JIT ones. Deferred until
+    needed so usage and read errors do not pay for importing numba.
+    """
+    try:
+        import flight_kernels as kernels
+    except ImportError:
+        import kernels
+    
+    return kernels
+
 def find_ground_level(altitude_data, window_size=20):
     """
     Find ground level by:
     1. Skip first 5 data points
     2. Using a rolling window to find periods of stable readings
     3. Looking for clusters of similar altitude readings
-    4. Taking the mean of the most common cluster as ground level
+    4. Taking the most common cluster as ground level
     """
-    # Calculate standard deviation in rolling windows
-    rolling_std = pd.Series(altitude_data).rolling(window_size).std()
-    
-    # Find stable periods (where std dev is small)
-    stable_mask = rolling_std < 0.5
-    stable_points = altitude_data[stable_mask]
+    kernels = load_kernels()
     
-    # Round to nearest 0.5m to find clusters
-    rounded = np.round(stable_points * 2) / 2
+    alt = np.asarray(altitude_data, dtype=np.float32)
+    ground_level = kernels.ground_level(alt, window_size, np.float32(0.5))
+    if np.isnan(ground_level):
+        raise ValueError("No stable ground readings found")
     
-    return rounded.mode()[0]
+    return ground_level
 
-def find_flight_period(df, ground_level, threshold=1.0):
+def find_flight_period(calibrated_altitude, threshold=1.0):
     """
     Detect flight start and end using apogee as reference:
     1. Find apogee (peak altitude)
-    2. Walk backwards from apogee to find launch point
-    3. Walk forwards from apogee to find landing point
+    2. Search backwards from apogee to find launch point
+    3. Search forwards from apogee to find landing point
     """
-    calibrated_altitude = df['Calibrated_Altitude']
+    alt = np.asarray(calibrated_altitude)
     
     # Find apogee
-    apogee_idx = calibrated_altitude.idxmax()
-    apogee_altitude = calibrated_altitude[apogee_idx]
+    apogee_idx = int(np.nanargmax(alt))
+    apogee_altitude = alt[apogee_idx]
     
-    # Walk backwards from apogee to find launch
+    # Search backwards from apogee for the last point on the ground (launch)
     launch_threshold = threshold  # meters above ground
-    for i in range(apogee_idx, 0, -1):
-        if calibrated_altitude[i] <= launch_threshold:
-            flight_start = i
-            break
-    else:
-        flight_start = 0
+    below = alt[:apogee_idx + 1] <= launch_threshold
+    flight_start = int(np.nonzero(below)[0][-1]) if below.any() else 0
     
-    # Walk forwards from apogee to find landing
+    # Search forwards from apogee for the first point on the ground (landing)
     landing_threshold = threshold  # meters above ground
-    for i in range(apogee_idx, len(calibrated_altitude)):
-        if calibrated_altitude[i] <= landing_threshold:
-            flight_end = i
-            break
+    below_after = alt[apogee_idx:] <= landing_threshold
+    if below_after.any():
+        flight_end = apogee_idx + int(np.argmax(below_after))
     else:
-        flight_end = len(calibrated_altitude) - 1
+        flight_end = alt.size - 1
     
     # Add some margin to capture full launch and landing
     flight_start = max(0, flight_start - 10)  # 0.5 seconds before detected launch
-    flight_end = min(len(calibrated_altitude) - 1, flight_end)  # 0.5 seconds after detected landing
+    flight_end = min(alt.size - 1, flight_end)  # 0.5 seconds after detected landing
     
     print(f"Apogee at index: {apogee_idx}, altitude: {apogee_altitude:.1f}m")
     
     return flight_start, flight_end
 
+def read_flight_log(csv_path):
+    """
+    Read only the columns used for analysis, preferring the multithreaded
+    pyarrow parser. Falls back to the C parser if pyarrow is missing or
+    rejects the file (pyarrow refuses the partial last row left when the
+    recorder is powered off, the C parser fills it with NaN).
+    The first 5 rows are dropped.
+    """
+    import pandas as pd
+    
+    usecols = ['Timestamp', 'Altitude(m)']
+    dtype = {'Timestamp': 'int64', 'Altitude(m)': 'float32'}
+    try:
+        df = pd.read_csv(csv_path, engine='pyarrow', usecols=usecols, dtype=dtype)
+    except (ImportError, pd.errors.ParserError):
+        df = pd.read_csv(csv_path, engine='c', usecols=usecols, dtype=dtype)
+    
+    return df.iloc[5:].reset_index(drop=True)
+
 def plot_altitude_data(csv_path):
     try:
         # Read CSV file and immediately drop first 5 rows
-        df = pd.read_csv(csv_path).iloc[5:]
-        df = df.reset_index(drop=True)
+        df = read_flight_log(csv_path)
+        kernels = load_kernels()
+        
+        # Work on the raw columns as plain arrays from here on; altitude
+        # stays float32, the sensor's precision, through the whole pipeline
+        timestamp = df['Timestamp'].to_numpy()
+        altitude = df['Altitude(m)'].to_numpy(dtype=np.float32)
         
         # Convert timestamp to seconds
-        df['Time'] = df['Timestamp'] / 1000.0
+        time = timestamp / 1000.0
         
         # Find ground level and calibrate altitude
-        ground_level = find_ground_level(df['Altitude(m)'])
-        df['Calibrated_Altitude'] = df['Altitude(m)'] - ground_level
-        df['Altitude_ft'] = df['Calibrated_Altitude'] * 3.28084  # For display only
+        ground_level = find_ground_level(altitude)
+        calibrated_altitude = altitude - np.float32(ground_level)
         
         # Calculate velocity and acceleration on full dataset first
         sampling_freq = 20  # 20Hz (1/0.05s)
-        df['Velocity_m_s'] = df['Calibrated_Altitude'].diff(periods=sampling_freq)
-        df['Acceleration_m_s2'] = df['Velocity_m_s'].diff(periods=sampling_freq)
+        lag = sampling_freq  # difference over 1 second of samples
+        velocity, acceleration = kernels.derivatives(calibrated_altitude, lag,
+                                                     np.float32(lag / sampling_freq))
         
         # Find flight period
-        flight_start, flight_end = find_flight_period(df, ground_level)
+        flight_start, flight_end = find_flight_period(calibrated_altitude)
         print(f"Flight start: {flight_start}, Flight end: {flight_end}")
         
         # Get flight data and normalize time to start at 0
-        flight_data = df[flight_start:flight_end].copy()
-        start_time = flight_data['Time'].iloc[0]
-        flight_data['Time'] = flight_data['Time'] - start_time
-        time_data = flight_data['Time']
+        flight = slice(flight_start, flight_end)
+        time_data = time[flight] - time[flight_start]
+        flight_altitude = calibrated_altitude[flight]
+        flight_velocity = velocity[flight]
+        flight_acceleration = acceleration[flight]
+        
+        # Decimate what gets drawn to about 1 point per pixel; statistics
+        # below still use the full flight data
+        stride = max(1, len(time_data) // 2000)
+        plot_time = time_data[::stride]
+        plot_altitude = flight_altitude[::stride]
+        
+        # Imported here so usage and read errors do not pay for pyplot
+        import matplotlib
+        matplotlib.use('Agg')  # Only ever render to PNG, skip GUI backend setup
+        import matplotlib.pyplot as plt
         
         # Create subplots
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 12), sharex=True)
         
-        # Find apogee time for vertical line (in flight_data)
-        apogee_time = flight_data.loc[flight_data['Calibrated_Altitude'].idxmax(), 'Time']
+        # Fixed margins instead of tight_layout(); figure size and labels
+        # never change, so there is no need to measure every artist
+        fig.subplots_adjust(left=0.08, right=0.92, top=0.95, bottom=0.06, hspace=0.1)
+        
+        # Find apogee time for vertical line (in flight data)
+        apogee_time = time_data[np.nanargmax(flight_altitude)]
         
         # Plot 1: Altitude (with dual axis)
         ax1_m = ax1
         ax1_ft = ax1.twinx()  # Create second y-axis
         
         # Plot altitude in meters (blue) and feet (dashed gray)
-        ax1_m.plot(time_data, flight_data['Calibrated_Altitude'], 'b-', linewidth=1)
-        ax1_ft.plot(time_data, flight_data['Altitude_ft'], 'gray', linestyle='--', alpha=0.5)
+        ax1_m.plot(plot_time, plot_altitude, 'b-', linewidth=1)
+        ax1_ft.plot(plot_time, plot_altitude * 3.28084, 'gray', linestyle='--', alpha=0.5)
         
         # Set y-axis limits (900 ft = 274.32 meters)
         ax1_m.set_ylim(0, 274.32)
@@ -125,16 +168,16 @@ def plot_altitude_data(csv_path):
         ax3.margins(x=0)
         
         # Add altitude statistics
-        max_altitude_m = flight_data['Calibrated_Altitude'].max()
-        max_altitude_ft = flight_data['Altitude_ft'].max()
-        flight_duration = time_data.iloc[-1] - time_data.iloc[0]
+        max_altitude_m = np.nanmax(flight_altitude)
+        max_altitude_ft = max_altitude_m * 3.28084
+        flight_duration = time_data[-1] - time_data[0]
         stats_text = f'Max Altitude: {max_altitude_m:.1f} m ({max_altitude_ft:.1f} ft)\nFlight Duration: {flight_duration:.1f} s'
         ax1_m.text(0.98, 0.98, stats_text, transform=ax1_m.transAxes, 
                   verticalalignment='top', horizontalalignment='right',
                   bbox=dict(facecolor='white', alpha=0.8))
         
         # Plot 2: Velocity with apogee line
-        ax2.plot(time_data, flight_data['Velocity_m_s'], 'g-', linewidth=1)
+        ax2.plot(plot_time, flight_velocity[::stride], 'g-', linewidth=1)
         ax2.axvline(x=apogee_time, color='r', linestyle='--', alpha=0.5)
         ax2.set_ylabel('Velocity (m/s)')
         ax2.grid(True)
@@ -142,13 +185,13 @@ def plot_altitude_data(csv_path):
         ax2.set_ylim(-25, 100)
         
         # Add velocity statistics
-        max_velocity = flight_data['Velocity_m_s'].max()
+        max_velocity = np.nanmax(flight_velocity)
         ax2.text(0.98, 0.98, f'Max Velocity: {max_velocity:.1f} m/s', 
                 transform=ax2.transAxes, verticalalignment='top', horizontalalignment='right',
                 bbox=dict(facecolor='white', alpha=0.8))
         
         # Plot 3: Acceleration with apogee line
-        ax3.plot(time_data, flight_data['Acceleration_m_s2'], 'r-', linewidth=1)
+        ax3.plot(plot_time, flight_acceleration[::stride], 'r-', linewidth=1)
         ax3.axvline(x=apogee_time, color='r', linestyle='--', alpha=0.5)
         ax3.set_xlabel('Time (seconds)')
         ax3.set_ylabel('Acceleration (m/s²)')
@@ -157,17 +200,14 @@ def plot_altitude_data(csv_path):
         ax3.set_ylim(-20, 75)
         
         # Add acceleration statistics
-        max_accel = flight_data['Acceleration_m_s2'].max()
+        max_accel = np.nanmax(flight_acceleration)
         ax3.text(0.98, 0.98, f'Max Acceleration: {max_accel:.1f} m/s²', 
                 transform=ax3.transAxes, verticalalignment='top', horizontalalignment='right',
                 bbox=dict(facecolor='white', alpha=0.8))
         
-        # Adjust layout to prevent overlap
-        plt.tight_layout()
-        
         # Save the plot
         output_file = csv_path.replace('.csv', '_analysis.png')
-        plt.savefig(output_file)
+        plt.savefig(output_file, dpi=100, pil_kwargs={'compress_level': 1})
         print(f"Plot saved as: {output_file}")
         
         # Print summary statistics
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+import kernels
+
+
+def pandas_ground_level(altitude, window_size=20):
+    """The original rolling std + mode implementation, as a reference."""
+    altitude = pd.Series(altitude.astype(np.float64))
+    stable_points = altitude[altitude.rolling(window_size).std() < 0.5]
+    return (np.round(stable_points * 2) / 2).mode()[0]
+
+
+def synthetic_flight():
+    # 20s on the pad, a 25s flight to ~100m, then 20s after landing
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 25, 500)
+    flight = 101.2 + 8 * t * (25 - t) / 25 * 2
+    pad = 101.2 + rng.normal(0, 0.1, 400)
+    landed = 101.2 + rng.normal(0, 0.1, 400)
+    return np.concatenate([pad, flight, landed]).astype(np.float32)
+
+
+def kernel_ground_level(altitude):
+    return kernels.ground_level(altitude, 20, np.float32(0.5))
+
+
+def test_matches_pandas():
+    altitude = synthetic_flight()
+    assert kernel_ground_level(altitude) == pandas_ground_level(altitude)
+
+
+def test_nan_in_middle_matches_pandas():
+    altitude = synthetic_flight()
+    altitude[200] = np.nan
+    altitude[1100] = np.nan
+    assert kernel_ground_level(altitude) == pandas_ground_level(altitude)
+
+
+def test_truncated_last_row():
+    altitude = synthetic_flight()
+    altitude[-1] = np.nan
+    assert kernel_ground_level(altitude) == pandas_ground_level(altitude)
+
+
+def test_no_stable_readings():
+    altitude = np.arange(100, dtype=np.float32)
+    assert np.isnan(kernel_ground_level(altitude))
+    altitude[:] = np.nan
+    assert np.isnan(kernel_ground_level(altitude))